@@ -1,67 +1,195 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
-import uuid
-from datetime import datetime
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 
+from a2a_utils import new_id, now_iso
+
+
+log = logging.getLogger('a2a')
+
+
+class LazyJSON:
+    """Pretty-prints its object only if a log record is actually emitted"""
+    __slots__ = ('obj',)
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        return json.dumps(self.obj, indent=2)
+
+
+# Read-only commands; their results are cached per agent until a mutation or the TTL
+READ_RE = re.compile(r'^\s*(?:list|show)\b', re.I)
+READ_CACHE_TTL = 5.0
+
+
+AGENT_URLS = [
+    "http://localhost:5001",
+    "http://localhost:5002"
+]
+
+# Agent Cards persisted between runs; fresh entries skip discovery requests entirely
+CARD_CACHE_PATH = os.path.expanduser('~/.a2a_cards.json')
+MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def valid_card(card):
+    """True if an Agent Card has every field the router reads"""
+    return (
+        isinstance(card, dict)
+        and isinstance(card.get('name'), str)
+        and isinstance(card.get('description'), str)
+        and isinstance(card.get('endpoints'), dict)
+        and isinstance(card['endpoints'].get('task_send'), str)
+    )
+
 
 class A2ARouter:
     def __init__(self):
         self.agents = {}
+        # url -> {"card", "etag", "expires"}
+        self.card_cache = self._load_card_cache()
+
+        # One pooled keep-alive session for discovery and task dispatch
+        self.http = requests.Session()
+        self.http.headers['Connection'] = 'keep-alive'
+        self.http.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=32))
 
+        # (agent name, normalized command) -> (monotonic time, result)
+        self._read_cache = {}
 
+        # Worker threads so discovery and multi-agent dispatch overlap network waits
+        self.pool = ThreadPoolExecutor(max_workers=8)
 
         self.discover_agents()
 
+    def _load_card_cache(self):
+        """Read the on-disk card cache, dropping anything that isn't a well-formed entry"""
+        try:
+            with open(CARD_CACHE_PATH) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict):
+            return {}
+        return {
+            url: entry for url, entry in cache.items()
+            if isinstance(entry, dict)
+            and valid_card(entry.get('card'))
+            and isinstance(entry.get('expires'), (int, float))
+            and isinstance(entry.get('etag'), (str, type(None)))
+        }
+
+    def _save_card_cache(self):
+        try:
+            with open(CARD_CACHE_PATH, 'w') as f:
+                json.dump(self.card_cache, f)
+        except OSError as e:
+            print(f"⚠️  Could not save agent card cache: {e}")
+
+    def _discover_one(self, url):
+        """Fetch a single Agent Card, honouring the on-disk cache; returns (card, error)"""
+        entry = self.card_cache.get(url)
+        if entry and time.time() < entry['expires']:
+            return entry['card'], None
+
+        headers = {'If-None-Match': entry['etag']} if entry and entry.get('etag') else {}
+        try:
+            response = self.http.get(f"{url}/.well-known/agent.json", headers=headers, timeout=2)
+            if response.status_code == 304:
+                agent_card = entry['card']
+                etag = response.headers.get('ETag') or entry['etag']
+            elif response.status_code == 200:
+                agent_card = response.json()
+                etag = response.headers.get('ETag')
+            else:
+                return None, f"HTTP {response.status_code}"
+        except Exception as e:
+            return None, e
+        if not valid_card(agent_card):
+            return None, "invalid Agent Card"
+
+        max_age = MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        self.card_cache[url] = {
+            'card': agent_card,
+            'etag': etag,
+            'expires': time.time() + (int(max_age.group(1)) if max_age else 0)
+        }
+        return agent_card, None
+
     def discover_agents(self):
-        """Discover available agents by fetching their Agent Cards"""
-        agent_urls = [
-            "http://localhost:5001",
-            "http://localhost:5002"
-        ]
-
-        for url in agent_urls:
-            try:
-                response = requests.get(f"{url}/.well-known/agent.json")
-                if response.status_code == 200:
-                    agent_card = response.json()
-                    self.agents[agent_card['name']] = agent_card
-                    print(f"✅ Discovered agent: {agent_card['name']} at {url}")
-                else:
-                    print(f"❌ Failed to discover agent at {url}")
-            except Exception as e:
-                print(f"❌ Error discovering agent at {url}: {e}")
+        """Discover available agents by fetching their Agent Cards concurrently"""
+        for url, (agent_card, error) in zip(AGENT_URLS, self.pool.map(self._discover_one, AGENT_URLS)):
+            if agent_card:
+                self.agents[agent_card['name']] = agent_card
+                print(f"✅ Discovered agent: {agent_card['name']} at {url}")
+            elif isinstance(error, Exception):
+                print(f"❌ Error discovering agent at {url}: {error}")
+            else:
+                print(f"❌ Failed to discover agent at {url}")
+        self._save_card_cache()
 
     def route_command(self, command):
-        """Route command to appropriate agent based on keywords"""
+        """Route command to appropriate agents based on keywords"""
         cmd_lower = command.lower()
 
+        agents = []
         if 'product' in cmd_lower:
-            return 'ProductAgent'
-        elif 'customer' in cmd_lower:
-            return 'CustomerAgent'
-        else:
-            return None
+            agents.append('ProductAgent')
+        if 'customer' in cmd_lower:
+            agents.append('CustomerAgent')
+        return agents
 
 
 
-    def extract_result_from_a2a_response(self, a2a_response):
+    def extract_result_from_a2a_response(self, a2a_response, index=0):
         """Extract the actual result JSON from A2A response structure"""
         try:
             # Navigate through A2A response structure to get the actual result
             artifacts = a2a_response.get('artifacts', [])
             if artifacts:
                 parts = artifacts[0].get('parts', [])
-                if parts:
-                    result_text = parts[0].get('text', '{}')
-                    return json.loads(result_text)
+                if len(parts) > index:
+                    part = parts[index]
+                    if 'data' in part:
+                        return part['data']
+                    # Older agents send the result as a JSON string in a text part
+                    return json.loads(part.get('text', '{}'))
             return {}
         except Exception as e:
             print(f"⚠️  Error extracting result: {e}")
             return {}
 
     def send_task(self, agent_name, command):
-        """Send A2A task to specific agent"""
+        """Send A2A task to specific agent, answering repeated reads from the cache"""
+        if not READ_RE.match(command):
+            return self.send_tasks(agent_name, [command])
+
+        key = (agent_name, " ".join(command.lower().split()))
+        cached = self._read_cache.get(key)
+        if cached and time.monotonic() - cached[0] < READ_CACHE_TTL:
+            log.info("\n♻️  CACHED RESULT FROM %s", agent_name)
+            return cached[1]
+
+        result = self.send_tasks(agent_name, [command])
+        # Failed reads (e.g. an LLM timeout on the agent) must be retried, not replayed
+        if result.get('a2a_response', {}).get('status', {}).get('state') == 'completed':
+            self._read_cache[key] = (time.monotonic(), result)
+        return result
+
+    def invalidate_reads(self, agent_name):
+        """Drop cached read results for an agent after it may have changed data"""
+        self._read_cache = {k: v for k, v in self._read_cache.items() if k[0] != agent_name}
+
+    def send_tasks(self, agent_name, commands):
+        """Send several commands to one agent as a single A2A task (one text part each)"""
         if agent_name not in self.agents:
             return {'error': f'Agent {agent_name} not found'}
 
@@ -70,32 +198,40 @@ class A2ARouter:
 
         # A2A task format
         task = {
-            "id": str(uuid.uuid4()),
+            "id": new_id(),
             "message": {
                 "role": "user",
                 "parts": [
                     {
                         "type": "text",
                         "text": command
-                    }
+                    } for command in commands
                 ]
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
 
-        print(f"\n🚀 SENDING TO {agent_name}")
-        print(f"Endpoint: {endpoint}")
-        print(f"A2A Task: {json.dumps(task, indent=2)}")
+        log.info("\n🚀 SENDING TO %s", agent_name)
+        log.info("Endpoint: %s", endpoint)
+        log.debug("A2A Task: %s", LazyJSON(task))
+
+        if not all(READ_RE.match(command) for command in commands):
+            self.invalidate_reads(agent_name)
 
         try:
-            response = requests.post(endpoint, json=task)
+            response = self.http.post(endpoint, json=task)
             if response.status_code == 200:
                 a2a_result = response.json()
-                print(f"\n✅ RECEIVED FROM {agent_name}")
-                print(f"A2A Response: {json.dumps(a2a_result, indent=2)}")
+                log.info("\n✅ RECEIVED FROM %s", agent_name)
+                log.debug("A2A Response: %s", LazyJSON(a2a_result))
 
                 # Extract the actual result for OpenAI processing
-                extracted_result = self.extract_result_from_a2a_response(a2a_result)
+                if len(commands) == 1:
+                    extracted_result = self.extract_result_from_a2a_response(a2a_result)
+                else:
+                    extracted_result = [
+                        self.extract_result_from_a2a_response(a2a_result, i) for i in range(len(commands))
+                    ]
 
                 # Get user-friendly summary
 
@@ -110,16 +246,73 @@ class A2ARouter:
             return {'error': str(e)}
 
     def process_command(self, command):
-        """Process user command by routing to appropriate agent"""
-        agent_name = self.route_command(command)
+        """Process user command by routing to appropriate agent(s)"""
+        agent_names = self.route_command(command)
 
-        if not agent_name:
+        if not agent_names:
             return {'error': 'No suitable agent found for command'}
 
-        return self.send_task(agent_name, command)
+        if len(agent_names) == 1:
+            return self.send_task(agent_names[0], command)
+
+        # Command touches several agents: fan out concurrently
+        results = self.pool.map(lambda name: self.send_task(name, command), agent_names)
+        return {'results': dict(zip(agent_names, results))}
+
+    def process_commands(self, commands):
+        """Process several commands, sending one batched task per agent"""
+        batches = {}
+        unrouted = []
+        for command in commands:
+            agent_names = self.route_command(command)
+            if not agent_names:
+                unrouted.append(command)
+            for agent_name in agent_names:
+                batches.setdefault(agent_name, []).append(command)
+
+        results = self.pool.map(lambda name: self.send_tasks(name, batches[name]), batches)
+        results = dict(zip(batches, results))
+        if unrouted:
+            results['unrouted'] = {'error': f'No suitable agent found for: {"; ".join(unrouted)}'}
+        return {'results': results}
+
+
+def split_commands(line):
+    """Split a REPL line on ';' that sit outside quoted values"""
+    commands, current, quote = [], [], None
+    for i, ch in enumerate(line):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '\'"' and (i == 0 or line[i - 1].isspace()):
+            # Only a quote at the start of a word opens a value, so O'Brien stays literal
+            quote = ch
+        elif ch == ';':
+            commands.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    commands.append(''.join(current))
+    return [c.strip() for c in commands if c.strip()]
+
+
+def show_result(result):
+    if 'error' in result:
+        print(f"\n❌ Error: {result['error']}")
+    else:
+        # Display user-friendly response
+        if result.get('user_friendly'):
+
+            print(result['user_friendly'])
+
+        # Show the technical details
+        print(f"\n📋 Technical Details:")
+        print(f"Extracted Result: {json.dumps(result.get('extracted_result', {}), indent=2)}")
 
 
 def main():
+    # Full task/response dumps are DEBUG; set A2A_LOG_LEVEL=DEBUG to see them
+    logging.basicConfig(level=os.environ.get('A2A_LOG_LEVEL', 'INFO'), format='%(message)s')
     print("🌐 Enhanced A2A Router")
 
     router = A2ARouter()
@@ -134,6 +327,7 @@ def main():
     print("  - add rahul to customer")
     print("  - list all products")
     print("  - list all customers")
+    print("  - add rahul to customer; add priya to customer  (';' sends a batch)")
 
     while True:
         command = input("\n> ").strip()
@@ -145,19 +339,16 @@ def main():
         if not command:
             continue
 
-        result = router.process_command(command)
-
-        if 'error' in result:
-            print(f"\n❌ Error: {result['error']}")
+        commands = split_commands(command)
+        if not commands:
+            continue
+        if len(commands) > 1:
+            result = router.process_commands(commands)
         else:
-            # Display user-friendly response
-            if result.get('user_friendly'):
-
-                print(result['user_friendly'])
+            result = router.process_command(commands[0])
 
-            # Show the technical details
-            print(f"\n📋 Technical Details:")
-            print(f"Extracted Result: {json.dumps(result.get('extracted_result', {}), indent=2)}")
+        for agent_result in result.get('results', {None: result}).values():
+            show_result(agent_result)
 
 
 if __name__ == '__main__':
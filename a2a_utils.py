@@ -0,0 +1,61 @@
+"""Helpers shared by the A2A router and the agents"""
+import os
+import time
+from functools import wraps
+
+
+# Timestamps are second-precision UTC; re-format only when the second changes
+_last_timestamp = (0, "")
+
+
+def now_iso():
+    global _last_timestamp
+    second = int(time.time())
+    if second != _last_timestamp[0]:
+        _last_timestamp = (second, time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(second)))
+    return _last_timestamp[1]
+
+
+def new_id():
+    """Random 128-bit hex id; ids are opaque, so skip building a uuid.UUID"""
+    return os.urandom(16).hex()
+
+
+def command_failed(e):
+    return {
+        'status': 'error',
+        'action': 'parse_command',
+        'message': f'Command failed: {str(e)}'
+    }
+
+
+def normalize_command(command):
+    return " ".join(command.split())
+
+
+def require(params, required):
+    """Raise the mapped error for any required parameter that is missing or blank"""
+    if not isinstance(params, dict):
+        raise ValueError("Command parameters must be a JSON object")
+    for key, message in required.items():
+        value = params.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+        if not value:
+            raise ValueError(message)
+
+
+def intent(registry, name, required=None):
+    """Register an agent method in `registry` for an intent; `required` maps mandatory params to their error"""
+    required = required or {}
+
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, params):
+            require(params, required)
+            return handler(self, params)
+
+        wrapper.required = required
+        registry[name] = wrapper
+        return wrapper
+    return decorator
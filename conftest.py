@@ -0,0 +1,26 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def agent_modules(tmp_path_factory):
+    """Import both agents with stub API keys and their databases in a pytest temp dir"""
+    db_dir = tmp_path_factory.mktemp("db")
+    with pytest.MonkeyPatch.context() as mp:
+        # The agent modules read their API keys and open their databases at import
+        mp.setenv("GROQ_API_KEY", "test")
+        mp.setenv("OPENAI_API_KEY", "test")
+        mp.setenv("CUSTOMER_DB_PATH", str(db_dir / "customers.db"))
+        mp.setenv("PRODUCT_DB_PATH", str(db_dir / "products.db"))
+        yield importlib.import_module("customer_agent"), importlib.import_module("product_agent")
+
+
+@pytest.fixture(scope="session")
+def customer_agent(agent_modules):
+    return agent_modules[0]
+
+
+@pytest.fixture(scope="session")
+def product_agent(agent_modules):
+    return agent_modules[1]
@@ -1,13 +1,29 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 import sqlite3
+import hashlib
 import json
-import uuid
-from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+import importlib.util
 import os
+import shutil
+import subprocess
+import threading
+import re
 
+import httpx
 from langchain_groq import ChatGroq
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 
+from a2a_utils import command_failed, intent, new_id, normalize_command, now_iso, require
+
+# orjson serializes straight to bytes; fall back to the stdlib when it isn't installed
+try:
+    from orjson import dumps
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj).encode()
+
 app = Flask(__name__)
 
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
@@ -16,15 +32,149 @@ if not GROQ_API_KEY:
 GROQ_MODEL = "llama3-70b-8192" 
 
 
+# One pooled keep-alive client for every LLM call; HTTP/2 multiplexes requests over
+# a single connection when the optional h2 package is installed
+http_client = httpx.Client(
+    http2=importlib.util.find_spec('h2') is not None,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+
 llm = ChatGroq(
     groq_api_key=GROQ_API_KEY,
-    model_name=GROQ_MODEL
+    model_name=GROQ_MODEL,
+    http_client=http_client,
+    # JSON mode: the reply is always a parseable JSON object
+    model_kwargs={"response_format": {"type": "json_object"}}
 )
 
+SYSTEM_PROMPT = """
+Convert the user's request about customers into one JSON command {"intent": ..., "parameters": {...}}.
+Intents and their parameters:
+- add_customer: {"name": string, "email": string (optional)}
+- list_customers: {"after_id": integer (optional), "limit": integer (optional)}
+- delete_customer: {"id": integer}
+- update_customer: {"id": integer, "name": string (optional), "email": string (optional)}
+Omit optional fields the user did not mention. "Customers after 40" means after_id 40.
+Example: "Add Priya with email priya@example.com" ->
+{"intent": "add_customer", "parameters": {"name": "Priya", "email": "priya@example.com"}}
+"""
+
+BATCH_PROMPT = """
+You may instead receive several numbered requests. Convert each of them as above and
+return {"commands": [...]} with one JSON command per request, in the same order.
+"""
+
+
+# LLM parses are cached by (system prompt, normalized command) so that editing the
+# prompt never reuses stale output: the most recent in each process, and up to
+# LLM_CACHE_ROWS in the llm_cache table that every gunicorn worker shares
+LLM_CACHE_SIZE = 1024
+LLM_CACHE_ROWS = 10000
+
+
+def llm_parse(system_prompt, command):
+    """Ask the LLM to parse one command; callers go through the agent's parse cache"""
+    messages = [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=command)
+    ]
+    response = llm.invoke(messages)
+    return json.loads(response.content)
+
+
+def _add_parsed(match):
+    parameters = {"name": match.group("name").strip()}
+    if match.group("email"):
+        parameters["email"] = match.group("email")
+    return {"intent": "add_customer", "parameters": parameters}
+
+
+def _list_parsed(match):
+    parameters = {}
+    if match.group("after_id"):
+        parameters["after_id"] = int(match.group("after_id"))
+    return {"intent": "list_customers", "parameters": parameters}
+
+
+def _update_parsed(match):
+    parameters = {"id": int(match.group("id"))}
+    for field in ("name", "email"):
+        if match.group(field) is not None:
+            parameters[field] = match.group(field)
+    if len(parameters) == 1:
+        return None
+    return {"intent": "update_customer", "parameters": parameters}
+
+
+# A name is one to four plain words. Digits and clause words ("and", "for",
+# "customer", ...) are rejected so compound commands fall through to the LLM.
+NAME_WORD = r"(?!(?:and|for|with|to|customers?|products?)\b)[A-Za-z][A-Za-z.'-]*"
+NAME = rf"(?P<name>{NAME_WORD}(?:\s+{NAME_WORD}){{0,3}})"
+# Ends on a word character so sentence punctuation never lands in the stored address
+EMAIL = r"(?P<email>\S+@\S*\w)"
+
+
+# Deterministic parsers for unambiguous commands; anything else goes to the LLM
+FAST_PATTERNS = [
+    (re.compile(r"^\s*(?:list|show)(?:\s+me)?(?:\s+all)?\s+customers?"
+                r"(?:\s+after\s+(?:id\s*:?\s*)?(?P<after_id>\d+))?\s*$", re.I),
+     _list_parsed),
+    (re.compile(r"^\s*(?:delete|remove)\s+customer\s+(?:id\s*:?\s*)?(?P<id>\d+)\s*$", re.I),
+     lambda match: {"intent": "delete_customer", "parameters": {"id": int(match.group("id"))}}),
+    (re.compile(rf"^\s*add\s+{NAME}(?:\s+with\s+email\s+{EMAIL})?"
+                r"\s+to\s+(?:the\s+)?customers?\s*$", re.I),
+     _add_parsed),
+    (re.compile(rf"^\s*add\s+customer\s+{NAME}(?:\s+with\s+email\s+{EMAIL})?[.!]?\s*$", re.I),
+     _add_parsed),
+    (re.compile(r"""^\s*update\s+customer\s+(?:id\s*:?\s*)?(?P<id>\d+)"""
+                r"""(?:\s+name\s+to\s+(?P<q1>['"])(?P<name>.+?)(?P=q1))?"""
+                r"""(?:\s+(?:and\s+)?email\s+to\s+(?P<q2>['"])(?P<email>.+?)(?P=q2))?\s*$""", re.I),
+     _update_parsed),
+]
+
+
+def fast_parse(command):
+    """Parse a command locally; returns None when the LLM is needed"""
+    for pattern, build in FAST_PATTERNS:
+        match = pattern.match(command)
+        if match:
+            parsed = build(match)
+            if parsed:
+                return parsed
+    return None
+
+
+# intent name -> CustomerAgent handler, filled in by @intent below
+INTENT_HANDLERS = {}
+
+
+# Resolved from the script, not the cwd, so the dev server and gunicorn share one file
+DB_PATH = os.environ.get("CUSTOMER_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'customers.db')
+
+# Default number of rows returned by one list command
+PAGE_SIZE = 100
+
 class CustomerAgent:
-    def __init__(self):
-        self.conn = sqlite3.connect('customers.db', check_same_thread=False)
-        self.cursor = self.conn.cursor()
+    # Fixed SQL text so the connection's statement cache hits on every call
+    INSERT_SQL = 'INSERT INTO customers (name, email) VALUES (?, ?)'
+    # Keyset pagination: seeks on the primary key instead of scanning the whole table
+    LIST_SQL = 'SELECT id, name, email, created_at FROM customers WHERE id > ? ORDER BY id LIMIT ?'
+    DELETE_SQL = 'DELETE FROM customers WHERE id = ?'
+    UPDATE_SQL = {
+        # (name given, email given) -> statement
+        (True, False): 'UPDATE customers SET name = ? WHERE id = ?',
+        (False, True): 'UPDATE customers SET email = ? WHERE id = ?',
+        (True, True): 'UPDATE customers SET name = ?, email = ? WHERE id = ?'
+    }
+
+    # Shared LLM parse cache; trimming by rowid drops the oldest entries first
+    CACHE_GET_SQL = 'SELECT parsed FROM llm_cache WHERE key = ?'
+    CACHE_PUT_SQL = 'INSERT OR REPLACE INTO llm_cache (key, parsed) VALUES (?, ?)'
+    CACHE_TRIM_SQL = 'DELETE FROM llm_cache WHERE rowid <= last_insert_rowid() - ?'
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS customers (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -33,249 +183,340 @@ class CustomerAgent:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        self.cursor.execute('CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, parsed TEXT NOT NULL)')
         self.conn.commit()
+        # Per-process layer in front of llm_cache; the cached dict is shared, so callers must not mutate it
+        self._cached_llm_parse = lru_cache(maxsize=LLM_CACHE_SIZE)(self._shared_llm_parse)
+
+    def _db(self):
+        """This thread's connection and cursor; sqlite3 objects are never shared across threads"""
+        local = self._local
+        if not hasattr(local, 'conn'):
+            local.conn = sqlite3.connect(self.db_path)
+            local.cursor = local.conn.cursor()
+            # WAL lets readers and the writer overlap and avoids a journal fsync per commit
+            # Page cache stays at the 2 MB default since every worker thread opens its own
+            # connection; the mmap is shared across them through the OS page cache
+            local.cursor.executescript(
+                "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; "
+                "PRAGMA mmap_size=268435456;"
+            )
+        return local
+
+    @property
+    def conn(self):
+        return self._db().conn
+
+    @property
+    def cursor(self):
+        return self._db().cursor
 
     def add_customer(self, name, email=None):
-        self.cursor.execute(
-            'INSERT INTO customers (name, email) VALUES (?, ?)',
-            (name, email)
-        )
+        self.cursor.execute(self.INSERT_SQL, (name, email))
         self.conn.commit()
         return self.cursor.lastrowid
 
-    def list_customers(self):
-        self.cursor.execute('SELECT id, name, email, created_at FROM customers')
+    def add_customers_bulk(self, rows):
+        """Insert (name, email) rows in a single transaction; returns the new ids"""
+        if not rows:
+            return []
+        with self.conn:
+            self.cursor.executemany(self.INSERT_SQL, rows)
+            last_id = self.cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+        # AUTOINCREMENT ids are contiguous within one write transaction
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def list_customers(self, limit=PAGE_SIZE, after_id=0):
+        self.cursor.execute(self.LIST_SQL, (after_id, limit))
         return self.cursor.fetchall()
 
     def delete_customer(self, customer_id):
-        self.cursor.execute('DELETE FROM customers WHERE id = ?', (customer_id,))
+        self.cursor.execute(self.DELETE_SQL, (customer_id,))
         self.conn.commit()
         return self.cursor.rowcount  # Number of rows deleted
 
     def update_customer(self, customer_id, name=None, email=None):
-        updates = []
-        params = []
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if email is not None:
-            updates.append("email = ?")
-            params.append(email)
-        if not updates:
-            return 0  
-        params.append(customer_id)
-        sql = f'UPDATE customers SET {", ".join(updates)} WHERE id = ?'
-        self.cursor.execute(sql, tuple(params))
+        sql = self.UPDATE_SQL.get((name is not None, email is not None))
+        if sql is None:
+            return 0
+        params = tuple(v for v in (name, email) if v is not None) + (customer_id,)
+        self.cursor.execute(sql, params)
         self.conn.commit()
-        return self.cursor.rowcount  
+        return self.cursor.rowcount
 
-    def process_command(self, command):
-        system_prompt = """
-You are an assistant that converts user requests about customers into structured JSON commands.
-Supported commands:
-- To add a customer: {"intent":"add_customer","parameters":{"name":"customer name","email":"optional email"}}
-- To list customers: {"intent":"list_customers","parameters":{}}
-- To delete a customer: {"intent":"delete_customer","parameters":{"id": customer_id}}
-- To update a customer: {"intent":"update_customer","parameters":{"id": customer_id, "name": "new name (optional)", "email": "new email (optional)"}}
-If email or name are not mentioned in update, omit those fields.
-Examples:
-User: Add Rahul to customers
-Output: {"intent":"add_customer","parameters":{"name":"Rahul"}}
-User: Add Priya with email priya@example.com
-Output: {"intent":"add_customer","parameters":{"name":"Priya","email":"priya@example.com"}}
-User: List all customers
-Output: {"intent":"list_customers","parameters":{}}
-User: Show me all customers
-Output: {"intent":"list_customers","parameters":{}}
-User: Delete customer ID:1
-Output: {"intent":"delete_customer","parameters":{"id":1}}
-User: Remove customer 2
-Output: {"intent":"delete_customer","parameters":{"id":2}}
-User: Update customer 3 name to 'Rahul Sharma'
-Output: {"intent":"update_customer","parameters":{"id":3,"name":"Rahul Sharma"}}
-User: Update customer 4 email to 'new.email@example.com'
-Output: {"intent":"update_customer","parameters":{"id":4,"email":"new.email@example.com"}}
-User: Update customer 5 name to 'Arjun Patel' and email to 'arjun@patel.com'
-Output: {"intent":"update_customer","parameters":{"id":5,"name":"Arjun Patel","email":"arjun@patel.com"}}
-Return only the JSON, no extra text.
-"""
-        try:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=command)
-            ]
-            response = llm.invoke(messages)
-            result = response.content.strip()
+    def parse_command(self, command):
+        """Turn one command into {"intent", "parameters"}, using the LLM only when needed"""
+        return fast_parse(command) or self._llm_parse_command(command)
 
-            try:
-                parsed = json.loads(result)
-            except json.JSONDecodeError:
-                # Try to extract the first {...} block
-                import re
-                match = re.search(r'\{.*\}', result, re.DOTALL)
-                if match:
-                    parsed = json.loads(match.group())
-                else:
-                    raise ValueError("No JSON found in LLM response.")
-
-            intent = parsed.get("intent")
-            params = parsed.get("parameters", {})
-
-            if intent == "add_customer":
-                name = params.get("name", "").strip()
-                if not name:
-                    raise ValueError("Customer name missing")
-                email = params.get("email", None)
-                customer_id = self.add_customer(name, email)
-                return {
-                    'status': 'success',
-                    'action': 'add_customer',
-                    'message': f'Customer \"{name}\" added',
-                    'customer': {'id': customer_id, 'name': name, 'email': email}
-                }
-
-            elif intent == "list_customers":
-                customers = self.list_customers()
-                formatted_customers = [
-                    {
-                        'id': c[0],
-                        'name': c[1],
-                        'email': c[2],
-                        'created_at': c[3]
-                    } for c in customers
-                ]
-                return {
-                    'status': 'success',
-                    'action': 'list_customers',
-                    'message': f'Found {len(customers)} customer(s)',
-                    'customers': formatted_customers,
-                    'count': len(customers)
-                }
-
-            elif intent == "delete_customer":
-                cust_id = params.get("id")
-                if not cust_id:
-                    raise ValueError("Customer ID missing")
-                deleted = self.delete_customer(cust_id)
-                if deleted:
-                    return {
-                        'status': 'success',
-                        'action': 'delete_customer',
-                        'message': f'Customer with ID {cust_id} deleted'
-                    }
-                else:
-                    return {
-                        'status': 'error',
-                        'action': 'delete_customer',
-                        'message': f'No customer found with ID {cust_id}'
-                    }
-
-            elif intent == "update_customer":
-                cust_id = params.get("id")
-                if not cust_id:
-                    raise ValueError("Customer ID missing")
-                name = params.get("name", None)
-                email = params.get("email", None)
-                updated = self.update_customer(cust_id, name, email)
-                if updated:
-                    return {
-                        'status': 'success',
-                        'action': 'update_customer',
-                        'message': f'Customer with ID {cust_id} updated'
-                    }
-                else:
-                    return {
-                        'status': 'error',
-                        'action': 'update_customer',
-                        'message': f'No customer found with ID {cust_id} or nothing to update'
-                    }
-
-            else:
-                return {
-                    'status': 'error',
-                    'action': 'unknown',
-                    'message': 'Command not recognized'
-                }
+    def parse_commands(self, commands):
+        """Parse several commands; those the fast path misses share a single LLM call"""
+        parsed = [fast_parse(command) for command in commands]
+        misses = [i for i, p in enumerate(parsed) if p is None]
+        if misses:
+            llm_parsed = self._llm_parse_commands([commands[i] for i in misses])
+            for i, p in zip(misses, llm_parsed):
+                parsed[i] = p
+        return parsed
 
-        except Exception as e:
+    def _llm_parse_command(self, command):
+        """Ask the LLM to turn one command into {"intent", "parameters"}"""
+        return self._cached_llm_parse(SYSTEM_PROMPT, normalize_command(command))
+
+    def _shared_llm_parse(self, system_prompt, command):
+        """LLM parse backed by the llm_cache table, so a parse made in one worker serves them all"""
+        key = hashlib.sha1(f"{system_prompt}\0{command}".encode()).hexdigest()
+        row = self.cursor.execute(self.CACHE_GET_SQL, (key,)).fetchone()
+        if row:
+            return json.loads(row[0])
+        parsed = llm_parse(system_prompt, command)
+        with self.conn:
+            self.cursor.execute(self.CACHE_PUT_SQL, (key, json.dumps(parsed)))
+            self.cursor.execute(self.CACHE_TRIM_SQL, (LLM_CACHE_ROWS,))
+        return parsed
+
+    def _llm_parse_commands(self, commands):
+        """Ask the LLM to parse several commands in a single round-trip"""
+        numbered = "\n".join(f"{i}. {command}" for i, command in enumerate(commands, 1))
+        messages = [
+            SystemMessage(content=SYSTEM_PROMPT + BATCH_PROMPT),
+            HumanMessage(content=f"Commands:\n{numbered}")
+        ]
+        response = llm.invoke(messages)
+        parsed = json.loads(response.content).get("commands", [])
+        if len(parsed) != len(commands):
+            raise ValueError(f"Expected {len(commands)} commands from LLM, got {len(parsed)}")
+        return parsed
+
+    def execute(self, parsed):
+        """Run a parsed {"intent", "parameters"} command against the database"""
+        handler = INTENT_HANDLERS.get(parsed.get("intent"), CustomerAgent._unknown_intent)
+        return handler(self, parsed.get("parameters") or {})
+
+    @intent(INTENT_HANDLERS, "add_customer", required={"name": "Customer name missing"})
+    def _add_customer(self, params):
+        name, email = self._add_row(params)
+        customer_id = self.add_customer(name, email)
+        return self._added(customer_id, name, email)
+
+    @intent(INTENT_HANDLERS, "list_customers")
+    def _list_customers(self, params):
+        # Keep the page within 1..PAGE_SIZE; SQLite treats a negative LIMIT as no limit
+        limit = min(max(int(params.get("limit") or PAGE_SIZE), 1), PAGE_SIZE)
+        customers = self.list_customers(limit, int(params.get("after_id") or 0))
+        formatted_customers = [
+            {
+                'id': c[0],
+                'name': c[1],
+                'email': c[2],
+                'created_at': c[3]
+            } for c in customers
+        ]
+        return {
+            'status': 'success',
+            'action': 'list_customers',
+            'message': f'Found {len(customers)} customer(s)',
+            'customers': formatted_customers,
+            'count': len(customers),
+            # Pass back as after_id to fetch the next page
+            'next_after_id': customers[-1][0] if len(customers) == limit else None
+        }
+
+    @intent(INTENT_HANDLERS, "delete_customer", required={"id": "Customer ID missing"})
+    def _delete_customer(self, params):
+        cust_id = params["id"]
+        if self.delete_customer(cust_id):
+            return {
+                'status': 'success',
+                'action': 'delete_customer',
+                'message': f'Customer with ID {cust_id} deleted'
+            }
+        return {
+            'status': 'error',
+            'action': 'delete_customer',
+            'message': f'No customer found with ID {cust_id}'
+        }
+
+    @intent(INTENT_HANDLERS, "update_customer", required={"id": "Customer ID missing"})
+    def _update_customer(self, params):
+        cust_id = params["id"]
+        if self.update_customer(cust_id, params.get("name", None), params.get("email", None)):
             return {
-                'status': 'error',
-                'action': 'parse_command',
-                'message': f'Command failed: {str(e)}'
+                'status': 'success',
+                'action': 'update_customer',
+                'message': f'Customer with ID {cust_id} updated'
             }
+        return {
+            'status': 'error',
+            'action': 'update_customer',
+            'message': f'No customer found with ID {cust_id} or nothing to update'
+        }
+
+    def _unknown_intent(self, params):
+        return {
+            'status': 'error',
+            'action': 'unknown',
+            'message': 'Command not recognized'
+        }
+
+    def _added(self, customer_id, name, email):
+        return {
+            'status': 'success',
+            'action': 'add_customer',
+            'message': f'Customer \"{name}\" added',
+            'customer': {'id': customer_id, 'name': name, 'email': email}
+        }
+
+    def _add_row(self, params):
+        """(name, email) for INSERT_SQL from validated add_customer parameters"""
+        return params["name"].strip(), params.get("email", None)
+
+    def _execute_adds(self, parsed_adds):
+        """Run consecutive add_customer commands as one bulk insert, preserving order"""
+        results = [None] * len(parsed_adds)
+        rows = []
+        positions = []
+        for i, parsed in enumerate(parsed_adds):
+            try:
+                params = parsed.get("parameters") or {}
+                require(params, self._add_customer.required)
+                row = self._add_row(params)
+            except Exception as e:
+                results[i] = command_failed(e)
+                continue
+            rows.append(row)
+            positions.append(i)
+
+        try:
+            ids = self.add_customers_bulk(rows)
+        except Exception as e:
+            for i in positions:
+                results[i] = command_failed(e)
+            return results
+
+        for i, customer_id, (name, email) in zip(positions, ids, rows):
+            results[i] = self._added(customer_id, name, email)
+        return results
+
+    def process_command(self, command):
+        try:
+            return self.execute(self.parse_command(command))
+        except Exception as e:
+            return command_failed(e)
+
+    def process_commands(self, commands):
+        """Process a batch of commands with a single LLM call; one result per command"""
+        try:
+            parsed_commands = self.parse_commands(commands)
+        except Exception as e:
+            return [command_failed(e) for _ in commands]
+
+        results = []
+        for adds, group in groupby(
+            parsed_commands,
+            key=lambda parsed: isinstance(parsed, dict) and parsed.get("intent") == "add_customer"
+        ):
+            if adds:
+                results.extend(self._execute_adds(list(group)))
+                continue
+            for parsed in group:
+                try:
+                    results.append(self.execute(parsed))
+                except Exception as e:
+                    results.append(command_failed(e))
+        return results
 
 
 customer_agent = CustomerAgent()
 
 
+# The card never changes, so serialize it once at import
+AGENT_CARD = {
+    "name": "CustomerAgent",
+    "description": "Manages customer database operations using natural language",
+    "version": "1.2.0",
+    "url": "http://localhost:5002",
+    "capabilities": {
+        "streaming": False,
+        "function_calls": True,
+        "enhanced_responses": True
+    },
+    "skills": [
+        {
+            "id": "manage_customers",
+            "name": "Customer Management",
+            "description": "Add, list, delete, and update customers using natural language",
+            "examples": [
+                "Add Rahul to customers",
+                "Add Priya with email priya@example.com",
+                "List all customers",
+                "Show me all customers",
+                "Delete customer ID:1",
+                "Remove customer 2",
+                "Update customer 3 name to 'Rahul Sharma'",
+                "Update customer 4 email to 'new.email@example.com'",
+                "Update customer 5 name to 'Arjun Patel' and email to 'arjun@patel.com'"
+            ]
+        }
+    ],
+    "endpoints": {
+        "task_send": "http://localhost:5002/task/send"
+    }
+}
+AGENT_CARD_BYTES = dumps(AGENT_CARD)
+AGENT_CARD_ETAG = hashlib.sha1(AGENT_CARD_BYTES).hexdigest()
+# Lets routers keep the card on disk and revalidate it cheaply
+AGENT_CARD_HEADERS = {'Cache-Control': 'max-age=3600', 'ETag': f'"{AGENT_CARD_ETAG}"'}
+
+
 @app.route('/.well-known/agent.json')
 def agent_card():
-    return jsonify({
-        "name": "CustomerAgent",
-        "description": "Manages customer database operations using natural language",
-        "version": "1.2.0",
-        "url": "http://localhost:5002",
-        "capabilities": {
-            "streaming": False,
-            "function_calls": True,
-            "enhanced_responses": True
-        },
-        "skills": [
-            {
-                "id": "manage_customers",
-                "name": "Customer Management",
-                "description": "Add, list, delete, and update customers using natural language",
-                "examples": [
-                    "Add Rahul to customers",
-                    "Add Priya with email priya@example.com",
-                    "List all customers",
-                    "Show me all customers",
-                    "Delete customer ID:1",
-                    "Remove customer 2",
-                    "Update customer 3 name to 'Rahul Sharma'",
-                    "Update customer 4 email to 'new.email@example.com'",
-                    "Update customer 5 name to 'Arjun Patel' and email to 'arjun@patel.com'"
-                ]
-            }
-        ],
-        "endpoints": {
-            "task_send": "http://localhost:5002/task/send"
-        }
-    })
+    if AGENT_CARD_ETAG in request.if_none_match:
+        return Response(status=304, headers=AGENT_CARD_HEADERS)
+    return Response(AGENT_CARD_BYTES, mimetype='application/json', headers=AGENT_CARD_HEADERS)
 
 
 @app.route('/task/send', methods=['POST'])
 def handle_task():
     data = request.get_json()
-    command = ""
+    commands = []
     if 'message' in data and 'parts' in data['message']:
-        for part in data['message']['parts']:
-            if part['type'] == 'text':
-                command = part['text']
-                break
+        commands = [part['text'] for part in data['message']['parts'] if part['type'] == 'text']
 
-    task_id = data.get('id', str(uuid.uuid4()))
+    task_id = data.get('id') or new_id()
 
-    # Process the command using the agent
-    result = customer_agent.process_command(command)
+    # Process the command(s); several text parts are a batch parsed with one LLM call
+    if len(commands) > 1:
+        results = customer_agent.process_commands(commands)
+    else:
+        results = [customer_agent.process_command(commands[0] if commands else "")]
 
     # Build A2A response
     response = {
         "id": task_id,
         "status": {
-            "state": "completed" if result['status'] == 'success' else "failed",
-            "timestamp": datetime.now().isoformat()
+            "state": "completed" if all(r['status'] == 'success' for r in results) else "failed",
+            "timestamp": now_iso()
         },
         "artifacts": [{
-            "id": str(uuid.uuid4()),
-            "type": "text",
-            "parts": [{"type": "text", "text": json.dumps(result)}]
+            "id": new_id(),
+            "type": "json",
+            # Results travel as nested JSON rather than a JSON string inside JSON
+            "parts": [{"type": "json", "data": result} for result in results]
         }]
     }
 
-    return jsonify(response)
+    return Response(dumps(response), mimetype='application/json')
 
 
 if __name__ == '__main__':
     print("🚀 Customer Agent (LangChain+Groq) running on http://localhost:5002")
-    app.run(host='localhost', port=5002, debug=True)
+    if shutil.which('gunicorn'):
+        # Threaded worker pool so concurrent A2A tasks overlap their LLM calls;
+        # pass the key through so workers don't prompt for it again
+        subprocess.run(
+            ['gunicorn', '-w', '4', '-k', 'gthread', '--threads', '8',
+             '--chdir', os.path.dirname(os.path.abspath(__file__)), '-b', 'localhost:5002', 'customer_agent:app'],
+            env={**os.environ, 'GROQ_API_KEY': GROQ_API_KEY}
+        )
+    else:
+        app.run(host='localhost', port=5002, debug=True)
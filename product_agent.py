@@ -1,25 +1,182 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 import sqlite3
+import hashlib
 import json
-import uuid
-from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+import importlib.util
 import os
+import shutil
+import subprocess
+import threading
+import re
 
+import httpx
 from openai import OpenAI
 
+from a2a_utils import command_failed, intent, new_id, normalize_command, now_iso, require
+
+# orjson serializes straight to bytes; fall back to the stdlib when it isn't installed
+try:
+    from orjson import dumps
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj).encode()
+
 app = Flask(__name__)
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     OPENAI_API_KEY = input("Enter your OpenAI API key: ")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# One pooled keep-alive client for every LLM call; HTTP/2 multiplexes requests over
+# a single connection when the optional h2 package is installed
+http_client = httpx.Client(
+    http2=importlib.util.find_spec('h2') is not None,
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+)
+
+client = OpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+
+SYSTEM_PROMPT = """
+Convert the user's request about products into one JSON command {"intent": ..., "parameters": {...}}.
+Intents and their parameters:
+- add_product: {"name": string, "description": string (optional)}
+- list_products: {"after_id": integer (optional), "limit": integer (optional)}
+- delete_product: {"id": integer}
+- update_product: {"id": integer, "name": string (optional), "description": string (optional)}
+Omit optional fields the user did not mention. "Products after 40" means after_id 40.
+Example: "Add a Yoga Mat with description Eco-friendly" ->
+{"intent": "add_product", "parameters": {"name": "Yoga Mat", "description": "Eco-friendly"}}
+"""
+
+BATCH_PROMPT = """
+You may instead receive several numbered requests. Convert each of them as above and
+return {"commands": [...]} with one JSON command per request, in the same order.
+"""
+
+
+def complete(system_prompt, content, max_tokens):
+    response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": content}
+        ],
+        temperature=0.1,
+        max_tokens=max_tokens,
+        # JSON mode: the reply is always a parseable JSON object
+        response_format={"type": "json_object"}
+    )
+    return json.loads(response.choices[0].message.content.strip())
+
+
+# LLM parses are cached by (system prompt, normalized command) so that editing the
+# prompt never reuses stale output: the most recent in each process, and up to
+# LLM_CACHE_ROWS in the llm_cache table that every gunicorn worker shares
+LLM_CACHE_SIZE = 1024
+LLM_CACHE_ROWS = 10000
+
+
+def llm_parse(system_prompt, command):
+    """Ask the LLM to parse one command; callers go through the agent's parse cache"""
+    return complete(system_prompt, command, 200)
+
+
+def _add_parsed(match):
+    parameters = {"name": match.group("name").strip()}
+    if match.group("description"):
+        parameters["description"] = match.group("description")
+    return {"intent": "add_product", "parameters": parameters}
+
+
+def _list_parsed(match):
+    parameters = {}
+    if match.group("after_id"):
+        parameters["after_id"] = int(match.group("after_id"))
+    return {"intent": "list_products", "parameters": parameters}
+
+
+def _update_parsed(match):
+    parameters = {"id": int(match.group("id"))}
+    for field in ("name", "description"):
+        if match.group(field) is not None:
+            parameters[field] = match.group(field)
+    if len(parameters) == 1:
+        return None
+    return {"intent": "update_product", "parameters": parameters}
+
+
+# A name is one to four plain words. Digits and clause words ("and", "for",
+# "customer", ...) are rejected so compound commands fall through to the LLM.
+NAME_WORD = r"(?!(?:and|for|with|to|customers?|products?)\b)[A-Za-z][A-Za-z.'-]*"
+NAME = rf"(?P<name>{NAME_WORD}(?:\s+{NAME_WORD}){{0,3}})"
+
+
+# Deterministic parsers for unambiguous commands; anything else goes to the LLM
+FAST_PATTERNS = [
+    (re.compile(r"^\s*(?:list|show)(?:\s+me)?(?:\s+all)?\s+(?:products?|items)"
+                r"(?:\s+after\s+(?:id\s*:?\s*)?(?P<after_id>\d+))?\s*$", re.I),
+     _list_parsed),
+    (re.compile(r"^\s*(?:delete|remove)\s+product\s+(?:id\s*:?\s*)?(?P<id>\d+)\s*$", re.I),
+     lambda match: {"intent": "delete_product", "parameters": {"id": int(match.group("id"))}}),
+    (re.compile(rf"""^\s*add\s+(?:an?\s+)?{NAME}"""
+                r"""(?:\s+with\s+description\s+(?P<q>['"])(?P<description>.+?)(?P=q))?"""
+                r"""\s+to\s+(?:the\s+)?products?\s*$""", re.I),
+     _add_parsed),
+    (re.compile(rf"""^\s*add\s+product\s+{NAME}"""
+                r"""(?:\s+with\s+description\s+(?P<q>['"])(?P<description>.+?)(?P=q))?\s*$""", re.I),
+     _add_parsed),
+    (re.compile(r"""^\s*update\s+product\s+(?:id\s*:?\s*)?(?P<id>\d+)"""
+                r"""(?:\s+name\s+to\s+(?P<q1>['"])(?P<name>.+?)(?P=q1))?"""
+                r"""(?:\s+(?:and\s+)?description\s+to\s+(?P<q2>['"])(?P<description>.+?)(?P=q2))?\s*$""", re.I),
+     _update_parsed),
+]
+
+
+def fast_parse(command):
+    """Parse a command locally; returns None when the LLM is needed"""
+    for pattern, build in FAST_PATTERNS:
+        match = pattern.match(command)
+        if match:
+            parsed = build(match)
+            if parsed:
+                return parsed
+    return None
+
+
+# intent name -> ProductAgent handler, filled in by @intent below
+INTENT_HANDLERS = {}
+
+
+# Resolved from the script, not the cwd, so the dev server and gunicorn share one file
+DB_PATH = os.environ.get("PRODUCT_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products.db')
+
+# Default number of rows returned by one list command
+PAGE_SIZE = 100
 
 
 class ProductAgent:
-    def __init__(self):
-        self.conn = sqlite3.connect('products.db', check_same_thread=False)
-        self.cursor = self.conn.cursor()
+    # Fixed SQL text so the connection's statement cache hits on every call
+    INSERT_SQL = 'INSERT INTO products (name, description) VALUES (?, ?)'
+    # Keyset pagination: seeks on the primary key instead of scanning the whole table
+    LIST_SQL = 'SELECT id, name, description, created_at FROM products WHERE id > ? ORDER BY id LIMIT ?'
+    DELETE_SQL = 'DELETE FROM products WHERE id = ?'
+    UPDATE_SQL = {
+        # (name given, description given) -> statement
+        (True, False): 'UPDATE products SET name = ? WHERE id = ?',
+        (False, True): 'UPDATE products SET description = ? WHERE id = ?',
+        (True, True): 'UPDATE products SET name = ?, description = ? WHERE id = ?'
+    }
+
+    # Shared LLM parse cache; trimming by rowid drops the oldest entries first
+    CACHE_GET_SQL = 'SELECT parsed FROM llm_cache WHERE key = ?'
+    CACHE_PUT_SQL = 'INSERT OR REPLACE INTO llm_cache (key, parsed) VALUES (?, ?)'
+    CACHE_TRIM_SQL = 'DELETE FROM llm_cache WHERE rowid <= last_insert_rowid() - ?'
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS products (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -28,242 +185,338 @@ class ProductAgent:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
+        self.cursor.execute('CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, parsed TEXT NOT NULL)')
         self.conn.commit()
+        # Per-process layer in front of llm_cache; the cached dict is shared, so callers must not mutate it
+        self._cached_llm_parse = lru_cache(maxsize=LLM_CACHE_SIZE)(self._shared_llm_parse)
+
+    def _db(self):
+        """This thread's connection and cursor; sqlite3 objects are never shared across threads"""
+        local = self._local
+        if not hasattr(local, 'conn'):
+            local.conn = sqlite3.connect(self.db_path)
+            local.cursor = local.conn.cursor()
+            # WAL lets readers and the writer overlap and avoids a journal fsync per commit
+            # Page cache stays at the 2 MB default since every worker thread opens its own
+            # connection; the mmap is shared across them through the OS page cache
+            local.cursor.executescript(
+                "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; "
+                "PRAGMA mmap_size=268435456;"
+            )
+        return local
+
+    @property
+    def conn(self):
+        return self._db().conn
+
+    @property
+    def cursor(self):
+        return self._db().cursor
 
     def add_product(self, name, description=None):
-        self.cursor.execute(
-            'INSERT INTO products (name, description) VALUES (?, ?)',
-            (name, description)
-        )
+        self.cursor.execute(self.INSERT_SQL, (name, description))
         self.conn.commit()
         return self.cursor.lastrowid
 
-    def list_products(self):
-        self.cursor.execute('SELECT id, name, description, created_at FROM products')
+    def add_products_bulk(self, rows):
+        """Insert (name, description) rows in a single transaction; returns the new ids"""
+        if not rows:
+            return []
+        with self.conn:
+            self.cursor.executemany(self.INSERT_SQL, rows)
+            last_id = self.cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+        # AUTOINCREMENT ids are contiguous within one write transaction
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+
+    def list_products(self, limit=PAGE_SIZE, after_id=0):
+        self.cursor.execute(self.LIST_SQL, (after_id, limit))
         return self.cursor.fetchall()
 
     def delete_product(self, product_id):
-        self.cursor.execute('DELETE FROM products WHERE id = ?', (product_id,))
+        self.cursor.execute(self.DELETE_SQL, (product_id,))
         self.conn.commit()
         return self.cursor.rowcount  # Number of rows deleted
 
     def update_product(self, product_id, name=None, description=None):
-        updates = []
-        params = []
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if not updates:
+        sql = self.UPDATE_SQL.get((name is not None, description is not None))
+        if sql is None:
             return 0  # Nothing to update
-        params.append(product_id)
-        sql = f'UPDATE products SET {", ".join(updates)} WHERE id = ?'
-        self.cursor.execute(sql, tuple(params))
+        params = tuple(v for v in (name, description) if v is not None) + (product_id,)
+        self.cursor.execute(sql, params)
         self.conn.commit()
         return self.cursor.rowcount  # Number of rows updated
 
+    def parse_command(self, command):
+        """Turn one command into {"intent", "parameters"}, using the LLM only when needed"""
+        return fast_parse(command) or self._llm_parse_command(command)
+
+    def parse_commands(self, commands):
+        """Parse several commands; those the fast path misses share a single LLM call"""
+        parsed = [fast_parse(command) for command in commands]
+        misses = [i for i, p in enumerate(parsed) if p is None]
+        if misses:
+            llm_parsed = self._llm_parse_commands([commands[i] for i in misses])
+            for i, p in zip(misses, llm_parsed):
+                parsed[i] = p
+        return parsed
+
+    def _llm_parse_command(self, command):
+        """Ask the LLM to turn one command into {"intent", "parameters"}"""
+        return self._cached_llm_parse(SYSTEM_PROMPT, normalize_command(command))
+
+    def _shared_llm_parse(self, system_prompt, command):
+        """LLM parse backed by the llm_cache table, so a parse made in one worker serves them all"""
+        key = hashlib.sha1(f"{system_prompt}\0{command}".encode()).hexdigest()
+        row = self.cursor.execute(self.CACHE_GET_SQL, (key,)).fetchone()
+        if row:
+            return json.loads(row[0])
+        parsed = llm_parse(system_prompt, command)
+        with self.conn:
+            self.cursor.execute(self.CACHE_PUT_SQL, (key, json.dumps(parsed)))
+            self.cursor.execute(self.CACHE_TRIM_SQL, (LLM_CACHE_ROWS,))
+        return parsed
+
+    def _llm_parse_commands(self, commands):
+        """Ask the LLM to parse several commands in a single round-trip"""
+        numbered = "\n".join(f"{i}. {command}" for i, command in enumerate(commands, 1))
+        parsed = complete(
+            SYSTEM_PROMPT + BATCH_PROMPT,
+            f"Commands:\n{numbered}",
+            200 * len(commands)
+        ).get("commands", [])
+        if len(parsed) != len(commands):
+            raise ValueError(f"Expected {len(commands)} commands from LLM, got {len(parsed)}")
+        return parsed
+
+    def execute(self, parsed):
+        """Run a parsed {"intent", "parameters"} command against the database"""
+        handler = INTENT_HANDLERS.get(parsed.get("intent"), ProductAgent._unknown_intent)
+        return handler(self, parsed.get("parameters") or {})
+
+    @intent(INTENT_HANDLERS, "add_product", required={"name": "Product name missing"})
+    def _add_product(self, params):
+        name, description = self._add_row(params)
+        product_id = self.add_product(name, description)
+        return self._added(product_id, name, description)
+
+    @intent(INTENT_HANDLERS, "list_products")
+    def _list_products(self, params):
+        # Keep the page within 1..PAGE_SIZE; SQLite treats a negative LIMIT as no limit
+        limit = min(max(int(params.get("limit") or PAGE_SIZE), 1), PAGE_SIZE)
+        products = self.list_products(limit, int(params.get("after_id") or 0))
+        formatted_products = [
+            {
+                'id': p[0],
+                'name': p[1],
+                'description': p[2],
+                'created_at': p[3]
+            } for p in products
+        ]
+        return {
+            'status': 'success',
+            'action': 'list_products',
+            'message': f'Found {len(products)} product(s)',
+            'products': formatted_products,
+            'count': len(products),
+            # Pass back as after_id to fetch the next page
+            'next_after_id': products[-1][0] if len(products) == limit else None
+        }
+
+    @intent(INTENT_HANDLERS, "delete_product", required={"id": "Product ID missing"})
+    def _delete_product(self, params):
+        prod_id = params["id"]
+        if self.delete_product(prod_id):
+            return {
+                'status': 'success',
+                'action': 'delete_product',
+                'message': f'Product with ID {prod_id} deleted'
+            }
+        return {
+            'status': 'error',
+            'action': 'delete_product',
+            'message': f'No product found with ID {prod_id}'
+        }
+
+    @intent(INTENT_HANDLERS, "update_product", required={"id": "Product ID missing"})
+    def _update_product(self, params):
+        prod_id = params["id"]
+        if self.update_product(prod_id, params.get("name", None), params.get("description", None)):
+            return {
+                'status': 'success',
+                'action': 'update_product',
+                'message': f'Product with ID {prod_id} updated'
+            }
+        return {
+            'status': 'error',
+            'action': 'update_product',
+            'message': f'No product found with ID {prod_id} or nothing to update'
+        }
+
+    def _unknown_intent(self, params):
+        return {
+            'status': 'error',
+            'action': 'unknown',
+            'message': 'Command not recognized'
+        }
+
+    def _added(self, product_id, name, description):
+        return {
+            'status': 'success',
+            'action': 'add_product',
+            'message': f'Product \"{name}\" added',
+            'product': {'id': product_id, 'name': name, 'description': description}
+        }
+
+    def _add_row(self, params):
+        """(name, description) for INSERT_SQL from validated add_product parameters"""
+        return params["name"].strip(), params.get("description", None)
+
+    def _execute_adds(self, parsed_adds):
+        """Run consecutive add_product commands as one bulk insert, preserving order"""
+        results = [None] * len(parsed_adds)
+        rows = []
+        positions = []
+        for i, parsed in enumerate(parsed_adds):
+            try:
+                params = parsed.get("parameters") or {}
+                require(params, self._add_product.required)
+                row = self._add_row(params)
+            except Exception as e:
+                results[i] = command_failed(e)
+                continue
+            rows.append(row)
+            positions.append(i)
+
+        try:
+            ids = self.add_products_bulk(rows)
+        except Exception as e:
+            for i in positions:
+                results[i] = command_failed(e)
+            return results
+
+        for i, product_id, (name, description) in zip(positions, ids, rows):
+            results[i] = self._added(product_id, name, description)
+        return results
+
     def process_command(self, command):
-        system_prompt = """
-You are an assistant that converts user requests about products into structured JSON commands.
-Supported commands:
-- To add a product: {"intent":"add_product","parameters":{"name":"product name","description":"optional description"}}
-- To list products: {"intent":"list_products","parameters":{}}
-- To delete a product: {"intent":"delete_product","parameters":{"id": product_id}}
-- To update a product: {"intent":"update_product","parameters":{"id": product_id, "name": "new name (optional)", "description": "new description (optional)"}}
-If description or name are not mentioned in update, omit those fields.
-Examples:
-User: Add iPhone to products
-Output: {"intent":"add_product","parameters":{"name":"iPhone"}}
-User: Add a Yoga Mat with description Eco-friendly
-Output: {"intent":"add_product","parameters":{"name":"Yoga Mat","description":"Eco-friendly"}}
-User: List all products
-Output: {"intent":"list_products","parameters":{}}
-User: Show me all items
-Output: {"intent":"list_products","parameters":{}}
-User: Delete product ID:1
-Output: {"intent":"delete_product","parameters":{"id":1}}
-User: Remove product 2
-Output: {"intent":"delete_product","parameters":{"id":2}}
-User: Update product 3 name to 'Super Phone'
-Output: {"intent":"update_product","parameters":{"id":3,"name":"Super Phone"}}
-User: Update product 4 description to 'Limited edition'
-Output: {"intent":"update_product","parameters":{"id":4,"description":"Limited edition"}}
-User: Update product 5 name to 'Ultra Laptop' and description to '2025 model'
-Output: {"intent":"update_product","parameters":{"id":5,"name":"Ultra Laptop","description":"2025 model"}}
-Return only the JSON, no extra text.
-"""
         try:
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": command}
-                ],
-                temperature=0.1,
-                max_tokens=200
-            )
-            result = response.choices[0].message.content.strip()
-            parsed = json.loads(result)
-            intent = parsed.get("intent")
-            params = parsed.get("parameters", {})
-
-            if intent == "add_product":
-                name = params.get("name", "").strip()
-                if not name:
-                    raise ValueError("Product name missing")
-                description = params.get("description", None)
-                product_id = self.add_product(name, description)
-                return {
-                    'status': 'success',
-                    'action': 'add_product',
-                    'message': f'Product \"{name}\" added',
-                    'product': {'id': product_id, 'name': name, 'description': description}
-                }
-
-            elif intent == "list_products":
-                products = self.list_products()
-                formatted_products = [
-                    {
-                        'id': p[0],
-                        'name': p[1],
-                        'description': p[2],
-                        'created_at': p[3]
-                    } for p in products
-                ]
-                return {
-                    'status': 'success',
-                    'action': 'list_products',
-                    'message': f'Found {len(products)} product(s)',
-                    'products': formatted_products,
-                    'count': len(products)
-                }
-
-            elif intent == "delete_product":
-                prod_id = params.get("id")
-                if not prod_id:
-                    raise ValueError("Product ID missing")
-                deleted = self.delete_product(prod_id)
-                if deleted:
-                    return {
-                        'status': 'success',
-                        'action': 'delete_product',
-                        'message': f'Product with ID {prod_id} deleted'
-                    }
-                else:
-                    return {
-                        'status': 'error',
-                        'action': 'delete_product',
-                        'message': f'No product found with ID {prod_id}'
-                    }
-
-            elif intent == "update_product":
-                prod_id = params.get("id")
-                if not prod_id:
-                    raise ValueError("Product ID missing")
-                name = params.get("name", None)
-                description = params.get("description", None)
-                updated = self.update_product(prod_id, name, description)
-                if updated:
-                    return {
-                        'status': 'success',
-                        'action': 'update_product',
-                        'message': f'Product with ID {prod_id} updated'
-                    }
-                else:
-                    return {
-                        'status': 'error',
-                        'action': 'update_product',
-                        'message': f'No product found with ID {prod_id} or nothing to update'
-                    }
-
-            else:
-                return {
-                    'status': 'error',
-                    'action': 'unknown',
-                    'message': 'Command not recognized'
-                }
+            return self.execute(self.parse_command(command))
+        except Exception as e:
+            return command_failed(e)
 
+    def process_commands(self, commands):
+        """Process a batch of commands with a single LLM call; one result per command"""
+        try:
+            parsed_commands = self.parse_commands(commands)
         except Exception as e:
-            return {
-                'status': 'error',
-                'action': 'parse_command',
-                'message': f'Command failed: {str(e)}'
-            }
+            return [command_failed(e) for _ in commands]
+
+        results = []
+        for adds, group in groupby(
+            parsed_commands,
+            key=lambda parsed: isinstance(parsed, dict) and parsed.get("intent") == "add_product"
+        ):
+            if adds:
+                results.extend(self._execute_adds(list(group)))
+                continue
+            for parsed in group:
+                try:
+                    results.append(self.execute(parsed))
+                except Exception as e:
+                    results.append(command_failed(e))
+        return results
 
 
 product_agent = ProductAgent()
 
 
+# The card never changes, so serialize it once at import
+AGENT_CARD = {
+    "name": "ProductAgent",
+    "description": "Manages product database operations using natural language",
+    "version": "1.2.0",
+    "url": "http://localhost:5001",
+    "capabilities": {
+        "streaming": False,
+        "function_calls": True,
+        "enhanced_responses": True
+    },
+    "skills": [
+        {
+            "id": "manage_products",
+            "name": "Product Management",
+            "description": "Add, list, delete, and update products using natural language",
+            "examples": [
+                "Add iPhone to products",
+                "Add a Yoga Mat with description Eco-friendly",
+                "List all products",
+                "Show me all items",
+                "Delete product ID:1",
+                "Remove product 2",
+                "Update product 3 name to 'Super Phone'",
+                "Update product 4 description to 'Limited edition'",
+                "Update product 5 name to 'Ultra Laptop' and description to '2025 model'"
+            ]
+        }
+    ],
+    "endpoints": {
+        "task_send": "http://localhost:5001/task/send"
+    }
+}
+AGENT_CARD_BYTES = dumps(AGENT_CARD)
+AGENT_CARD_ETAG = hashlib.sha1(AGENT_CARD_BYTES).hexdigest()
+# Lets routers keep the card on disk and revalidate it cheaply
+AGENT_CARD_HEADERS = {'Cache-Control': 'max-age=3600', 'ETag': f'"{AGENT_CARD_ETAG}"'}
+
+
 @app.route('/.well-known/agent.json')
 def agent_card():
-    return jsonify({
-        "name": "ProductAgent",
-        "description": "Manages product database operations using natural language",
-        "version": "1.2.0",
-        "url": "http://localhost:5001",
-        "capabilities": {
-            "streaming": False,
-            "function_calls": True,
-            "enhanced_responses": True
-        },
-        "skills": [
-            {
-                "id": "manage_products",
-                "name": "Product Management",
-                "description": "Add, list, delete, and update products using natural language",
-                "examples": [
-                    "Add iPhone to products",
-                    "Add a Yoga Mat with description Eco-friendly",
-                    "List all products",
-                    "Show me all items",
-                    "Delete product ID:1",
-                    "Remove product 2",
-                    "Update product 3 name to 'Super Phone'",
-                    "Update product 4 description to 'Limited edition'",
-                    "Update product 5 name to 'Ultra Laptop' and description to '2025 model'"
-                ]
-            }
-        ],
-        "endpoints": {
-            "task_send": "http://localhost:5001/task/send"
-        }
-    })
+    if AGENT_CARD_ETAG in request.if_none_match:
+        return Response(status=304, headers=AGENT_CARD_HEADERS)
+    return Response(AGENT_CARD_BYTES, mimetype='application/json', headers=AGENT_CARD_HEADERS)
 
 
 @app.route('/task/send', methods=['POST'])
 def handle_task():
     data = request.get_json()
-    command = ""
+    commands = []
     if 'message' in data and 'parts' in data['message']:
-        for part in data['message']['parts']:
-            if part['type'] == 'text':
-                command = part['text']
-                break
+        commands = [part['text'] for part in data['message']['parts'] if part['type'] == 'text']
 
-    task_id = data.get('id', str(uuid.uuid4()))
+    task_id = data.get('id') or new_id()
 
-    # Process the command using the agent (now with NL support)
-    result = product_agent.process_command(command)
+    # Process the command(s); several text parts are a batch parsed with one LLM call
+    if len(commands) > 1:
+        results = product_agent.process_commands(commands)
+    else:
+        results = [product_agent.process_command(commands[0] if commands else "")]
 
     response = {
         "id": task_id,
         "status": {
-            "state": "completed" if result['status'] == 'success' else "failed",
-            "timestamp": datetime.now().isoformat()
+            "state": "completed" if all(r['status'] == 'success' for r in results) else "failed",
+            "timestamp": now_iso()
         },
         "artifacts": [{
-            "id": str(uuid.uuid4()),
-            "type": "text",
-            "parts": [{"type": "text", "text": json.dumps(result)}]
+            "id": new_id(),
+            "type": "json",
+            # Results travel as nested JSON rather than a JSON string inside JSON
+            "parts": [{"type": "json", "data": result} for result in results]
         }]
     }
 
-    return jsonify(response)
+    return Response(dumps(response), mimetype='application/json')
 
 
 if __name__ == '__main__':
     print("🚀 Product Agent (NL) running on http://localhost:5001")
-    app.run(host='localhost', port=5001, debug=True)
-
+    if shutil.which('gunicorn'):
+        # Threaded worker pool so concurrent A2A tasks overlap their LLM calls;
+        # pass the key through so workers don't prompt for it again
+        subprocess.run(
+            ['gunicorn', '-w', '4', '-k', 'gthread', '--threads', '8',
+             '--chdir', os.path.dirname(os.path.abspath(__file__)), '-b', 'localhost:5001', 'product_agent:app'],
+            env={**os.environ, 'OPENAI_API_KEY': OPENAI_API_KEY}
+        )
+    else:
+        app.run(host='localhost', port=5001, debug=True)
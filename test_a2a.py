@@ -0,0 +1,121 @@
+import json
+
+import pytest
+
+import a2a
+
+
+class StubResponse:
+    status_code = 200
+
+    def __init__(self, state):
+        self.payload = {
+            "id": "t",
+            "status": {"state": state},
+            "artifacts": [{"parts": [{"type": "json", "data": {"status": "success" if state == "completed" else "error"}}]}]
+        }
+
+    def json(self):
+        return self.payload
+
+
+CARD = {
+    "name": "CustomerAgent",
+    "description": "test",
+    "endpoints": {"task_send": "http://agent/task/send"}
+}
+
+
+class StubCardResponse:
+    status_code = 200
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def json(self):
+        return CARD
+
+
+class StubSession:
+    """Records every POST and answers with the queued task states in order"""
+
+    def __init__(self, *states):
+        self.states = list(states)
+        self.posted = []
+
+    def post(self, endpoint, json):
+        self.posted.append([part["text"] for part in json["message"]["parts"]])
+        return StubResponse(self.states.pop(0))
+
+
+@pytest.fixture
+def router(monkeypatch, tmp_path):
+    monkeypatch.setattr(a2a, "AGENT_URLS", [])
+    monkeypatch.setattr(a2a, "CARD_CACHE_PATH", str(tmp_path / "cards.json"))
+    router = a2a.A2ARouter()
+    router.agents["CustomerAgent"] = CARD
+    return router
+
+
+def test_repeated_read_is_served_from_cache(router):
+    router.http = StubSession("completed")
+    first = router.send_task("CustomerAgent", "list all customers")
+    assert router.send_task("CustomerAgent", "List  all customers") is first
+    assert router.http.posted == [["list all customers"]]
+
+
+def test_failed_read_is_not_cached(router):
+    router.http = StubSession("failed", "completed")
+    router.send_task("CustomerAgent", "list all customers")
+    router.send_task("CustomerAgent", "list all customers")
+    assert len(router.http.posted) == 2
+
+
+def test_mutation_invalidates_cached_reads(router):
+    router.http = StubSession("completed", "completed", "completed")
+    router.send_task("CustomerAgent", "list all customers")
+    router.send_task("CustomerAgent", "add customer Rahul")
+    router.send_task("CustomerAgent", "list all customers")
+    assert router.http.posted == [["list all customers"], ["add customer Rahul"], ["list all customers"]]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("list customers", ["list customers"]),
+    ("list customers;", ["list customers"]),
+    (" ; ;", []),
+    ("add customer Rahul; list products", ["add customer Rahul", "list products"]),
+    ("update product 3 description to 'a; b'", ["update product 3 description to 'a; b'"]),
+    ('add product X with description "x;y"; list products', ['add product X with description "x;y"', "list products"]),
+    ("add customer O'Brien; list customers", ["add customer O'Brien", "list customers"]),
+])
+def test_split_commands(line, expected):
+    assert a2a.split_commands(line) == expected
+
+
+@pytest.mark.parametrize("cache", [
+    [1, 2],
+    {"http://agent": 5},
+    {"http://agent": {"card": "text", "expires": 1e12, "etag": None}},
+    {"http://agent": {"card": {"name": "CustomerAgent"}, "expires": 1e12, "etag": None}},
+    {"http://agent": {"card": {**CARD, "endpoints": {}}, "expires": 1e12, "etag": None}},
+    {"http://agent": {"card": CARD, "expires": "soon", "etag": None}},
+    {"http://agent": {"card": CARD, "expires": 1e12, "etag": 7}},
+])
+def test_malformed_card_cache_is_discarded(router, cache):
+    with open(a2a.CARD_CACHE_PATH, "w") as f:
+        json.dump(cache, f)
+    assert router._load_card_cache() == {}
+
+
+def test_well_formed_card_cache_is_kept(router):
+    cache = {"http://agent": {"card": CARD, "expires": 1e12, "etag": '"abc"'}}
+    with open(a2a.CARD_CACHE_PATH, "w") as f:
+        json.dump(cache, f)
+    assert router._load_card_cache() == cache
+
+
+def test_card_without_etag_drops_the_old_one(router, monkeypatch):
+    router.card_cache["http://agent"] = {"card": CARD, "expires": 0, "etag": '"old"'}
+    monkeypatch.setattr(router.http, "get", lambda url, headers, timeout: StubCardResponse({}))
+    assert router._discover_one("http://agent") == (CARD, None)
+    assert router.card_cache["http://agent"]["etag"] is None
@@ -0,0 +1,61 @@
+import pytest
+
+
+@pytest.fixture
+def customers(customer_agent, tmp_path):
+    return customer_agent.CustomerAgent(str(tmp_path / "customers.db"))
+
+
+@pytest.fixture
+def products(product_agent, tmp_path):
+    return product_agent.ProductAgent(str(tmp_path / "products.db"))
+
+
+@pytest.fixture
+def llm_calls(monkeypatch, customer_agent):
+    """Stub the customer LLM and record every command it is asked to parse"""
+    calls = []
+
+    def llm_parse(system_prompt, command):
+        calls.append(command)
+        return {"intent": "list_customers", "parameters": {}}
+
+    monkeypatch.setattr(customer_agent, "llm_parse", llm_parse)
+    return calls
+
+
+def test_llm_parse_is_shared_between_workers(customer_agent, customers, llm_calls):
+    # A second agent on the same file stands in for another gunicorn worker
+    other_worker = customer_agent.CustomerAgent(customers.db_path)
+    assert customers.parse_command("which customers  do we have") == other_worker.parse_command(
+        "which customers do we have")
+    assert llm_calls == ["which customers do we have"]
+
+
+def test_batched_adds_fail_only_the_invalid_commands(customers):
+    results = customers._execute_adds([
+        {"intent": "add_customer", "parameters": {"name": " Rahul ", "email": "rahul@x.com"}},
+        {"intent": "add_customer", "parameters": {"name": "  "}},
+        {"intent": "add_customer", "parameters": "Priya"},
+        {"intent": "add_customer"},
+        {"intent": "add_customer", "parameters": {"name": "Priya"}},
+    ])
+    assert [r["status"] for r in results] == ["success", "error", "error", "error", "success"]
+    assert results[0]["customer"] == {"id": 1, "name": "Rahul", "email": "rahul@x.com"}
+    assert results[4]["customer"] == {"id": 2, "name": "Priya", "email": None}
+
+
+def test_batched_and_single_adds_store_the_same_row(products):
+    params = {"name": " Yoga Mat ", "description": "Eco-friendly"}
+    single = products.execute({"intent": "add_product", "parameters": params})
+    batched, = products._execute_adds([{"intent": "add_product", "parameters": params}])
+    assert batched["product"] == {**single["product"], "id": single["product"]["id"] + 1}
+
+
+@pytest.mark.parametrize("limit, count", [(-1, 1), (0, 2), (1, 1), (2, 2), (10**6, 2)])
+def test_list_limit_is_clamped_to_page_size(monkeypatch, customer_agent, customers, limit, count):
+    monkeypatch.setattr(customer_agent, "PAGE_SIZE", 2)
+    customers.add_customers_bulk([("Rahul", None), ("Priya", None), ("Arjun", None)])
+    result = customers.execute({"intent": "list_customers", "parameters": {"limit": limit}})
+    assert result["count"] == count
+    assert result["next_after_id"] == count
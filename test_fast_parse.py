@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("Add Rahul to customers", {"intent": "add_customer", "parameters": {"name": "Rahul"}}),
+    ("add customer Priya with email priya@example.com",
+     {"intent": "add_customer", "parameters": {"name": "Priya", "email": "priya@example.com"}}),
+    ("add Arjun Patel to customer", {"intent": "add_customer", "parameters": {"name": "Arjun Patel"}}),
+    ("add customer Andrew", {"intent": "add_customer", "parameters": {"name": "Andrew"}}),
+    ("add customer Rahul with email rahul@x.com.",
+     {"intent": "add_customer", "parameters": {"name": "Rahul", "email": "rahul@x.com"}}),
+    ("add Rahul with email rahul@x.com, to customers", None),
+    ("Show me all customers", {"intent": "list_customers", "parameters": {}}),
+    ("list customers after 40", {"intent": "list_customers", "parameters": {"after_id": 40}}),
+    ("Delete customer ID:1", {"intent": "delete_customer", "parameters": {"id": 1}}),
+    ("Update customer 5 name to 'Arjun Patel' and email to 'arjun@patel.com'",
+     {"intent": "update_customer", "parameters": {"id": 5, "name": "Arjun Patel", "email": "arjun@patel.com"}}),
+    # Anything compound or ambiguous must be left to the LLM
+    ("add customer Rahul and product iPhone", None),
+    ("add product Widget for customer Rahul", None),
+    ("add Rahul and Priya to customers", None),
+    ("add customer Rahul Kumar Singh Sharma Verma", None),
+    ("add product for customer bob", None),
+    ("delete customer bob", None),
+    ("update customer 3", None),
+])
+def test_customer_fast_parse(customer_agent, command, expected):
+    assert customer_agent.fast_parse(command) == expected
+
+
+@pytest.mark.parametrize("command, expected", [
+    ("Add iPhone to products", {"intent": "add_product", "parameters": {"name": "iPhone"}}),
+    ("add a Yoga Mat with description 'Eco-friendly' to products",
+     {"intent": "add_product", "parameters": {"name": "Yoga Mat", "description": "Eco-friendly"}}),
+    ("Show me all items", {"intent": "list_products", "parameters": {}}),
+    ("Remove product 2", {"intent": "delete_product", "parameters": {"id": 2}}),
+    ("Update product 4 description to 'Limited edition'",
+     {"intent": "update_product", "parameters": {"id": 4, "description": "Limited edition"}}),
+    ("add product iPhone priced 999.99", None),
+    ("add iPhone product 999.99", None),
+    ("add product Widget for customer Rahul", None),
+    ("add product iPhone and case", None),
+    ("add product iPhone 15", None),
+])
+def test_product_fast_parse(product_agent, command, expected):
+    assert product_agent.fast_parse(command) == expected